@@ -1,7 +1,7 @@
 import os
 from datetime import datetime, timedelta
 from calendar import monthrange
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
@@ -10,6 +10,14 @@ from google.auth.transport.requests import Request
 
 SCOPES = ["https://www.googleapis.com/auth/calendar.readonly"]
 
+# partial response: doar câmpurile folosite de _simplify / _parse_dt (+ id pentru deduplicare)
+EVENT_FIELDS = "nextPageToken,items(id,summary,location,start,end)"
+# când prima pagină nu ajunge, restul intervalului e împărțit în sub-ferestre de atâtea zile,
+# cerute într-un singur batch
+BULK_WINDOW_DAYS = int(os.getenv("GOOGLE_CALENDAR_WINDOW_DAYS", "7"))
+# câte sub-cereri intră într-un batch (limita recomandată de Calendar API e 50)
+MAX_BATCH_SIZE = 50
+
 
 class GoogleCalendarAdapter:
     def __init__(self):
@@ -101,28 +109,110 @@ class GoogleCalendarAdapter:
         }
 
     # ---------------- Fetch utils ----------------
+    def _events_request(self, time_min_iso: str, time_max_iso: str, page_token: Optional[str] = None,
+                        max_results: int = 250):
+        return self.service.events().list(
+            calendarId="primary",
+            singleEvents=True,
+            orderBy="startTime",
+            timeMin=time_min_iso,
+            timeMax=time_max_iso,
+            maxResults=max_results,
+            pageToken=page_token,
+            fields=EVENT_FIELDS,
+        )
+
+    def _split_window(self, time_min_iso: str, time_max_iso: str) -> List[Tuple[datetime, datetime]]:
+        """Împarte [timeMin, timeMax) în sub-ferestre consecutive de BULK_WINDOW_DAYS zile."""
+        lo = datetime.fromisoformat(time_min_iso.replace("Z", "+00:00"))
+        hi = datetime.fromisoformat(time_max_iso.replace("Z", "+00:00"))
+        step = timedelta(days=max(1, BULK_WINDOW_DAYS))
+        windows = []
+        while lo < hi:
+            windows.append((lo, min(lo + step, hi)))
+            lo += step
+        return windows
+
     def _list_events(self, time_min_iso: str, time_max_iso: str, cap: int = 500) -> List[dict]:
-        """Listează evenimente între timeMin și timeMax, ordonate, cu paging."""
-        events, page_token = [], None
-        while True:
-            resp = self.service.events().list(
-                calendarId="primary",
-                singleEvents=True,
-                orderBy="startTime",
-                timeMin=time_min_iso,
-                timeMax=time_max_iso,
-                maxResults=250,
-                pageToken=page_token,
-            ).execute()
-            items = resp.get("items", [])
-            events.extend(items)
-            if len(events) >= cap:
-                break
+        """
+        Listează evenimente între timeMin și timeMax, ordonate, cu paging.
+        Se cere întâi o singură pagină; doar dacă are `nextPageToken` (calendar încărcat),
+        restul intervalului e cerut pe sub-ferestre printr-un batch HTTP, apoi concatenat în ordine.
+        """
+        resp = self._events_request(time_min_iso, time_max_iso).execute()
+        events = resp.get("items", [])
+        page_token = resp.get("nextPageToken")
+
+        if page_token and events and len(events) < cap and hasattr(self.service, "new_batch_http_request"):
+            # reluăm de la startul ultimului eveniment primit, cu o zi marjă (all-day e interpretat
+            # în TZ-ul serverului, nu al calendarului); dublurile sunt eliminate după id
+            lo = datetime.fromisoformat(time_min_iso.replace("Z", "+00:00"))
+            last_start = self._parse_dt(events[-1], "start")
+            resume = max(lo, last_start - timedelta(days=1)) if last_start else lo
+            windows = self._split_window(resume.isoformat(), time_max_iso)
+            if len(windows) > 1:
+                seen = {e.get("id") for e in events}
+                for e in self._list_events_batched(windows, cap):
+                    if e.get("id") not in seen:
+                        seen.add(e.get("id"))
+                        events.append(e)
+                return events[:cap]
+
+        while page_token and len(events) < cap:
+            resp = self._events_request(time_min_iso, time_max_iso, page_token).execute()
+            events.extend(resp.get("items", []))
             page_token = resp.get("nextPageToken")
-            if not page_token:
-                break
         return events
 
+    def _list_events_batched(self, windows: List[Tuple[datetime, datetime]], cap: int) -> List[dict]:
+        results: List[List[dict]] = [[] for _ in windows]
+        tokens: List[Optional[str]] = [None] * len(windows)
+        errors: List[Exception] = []
+
+        def on_response(request_id, response, exception):
+            i = int(request_id)
+            if exception is not None:
+                errors.append(exception)
+                return
+            results[i].extend(response.get("items", []))
+            tokens[i] = response.get("nextPageToken")
+
+        pending = list(range(len(windows)))
+        while pending:
+            for chunk_start in range(0, len(pending), MAX_BATCH_SIZE):
+                batch = self.service.new_batch_http_request(callback=on_response)
+                for i in pending[chunk_start: chunk_start + MAX_BATCH_SIZE]:
+                    lo, hi = windows[i]
+                    batch.add(self._events_request(lo.isoformat(), hi.isoformat(), tokens[i]), request_id=str(i))
+                batch.execute()
+            if errors:
+                raise errors[0]
+            pending = [i for i in pending if tokens[i]]
+
+            # ne oprim când ferestrele complete de la început acoperă deja `cap`
+            total = 0
+            for i in range(len(windows)):
+                if tokens[i]:
+                    break
+                total += len(results[i])
+            if total >= cap:
+                break
+
+        # un eveniment care traversează granița apare în ambele ferestre: îl păstrăm la prima apariție
+        events: List[dict] = []
+        seen = set()
+        for items in results:
+            for e in items:
+                if e.get("id") in seen:
+                    continue
+                seen.add(e.get("id"))
+                events.append(e)
+        return events[:cap]
+
+    def get_events_between(self, time_min_iso: str, time_max_iso: str, cap: int = 400) -> List[dict]:
+        """Evenimente simplificate între timeMin și timeMax (ISO), ordonate cronologic."""
+        return [self._simplify(e) for e in self._list_events(time_min_iso, time_max_iso, cap=cap)]
+
     # ---------------- Cerința ta: split pe luni ----------------
     def get_month_split(self, limit_past: int = 50, limit_future: int = 50) -> Dict[str, List[dict]]:
         """
@@ -213,13 +303,9 @@ class GoogleCalendarAdapter:
     def get_current_event(self) -> Optional[dict]:
         """Evenimentul care rulează ACUM (dacă există)."""
         now = datetime.now().astimezone()
-        resp = self.service.events().list(
-            calendarId="primary",
-            singleEvents=True,
-            orderBy="startTime",
-            timeMin=(now - timedelta(days=1)).isoformat(),
-            timeMax=(now + timedelta(days=1)).isoformat(),
-            maxResults=250,
+        resp = self._events_request(
+            (now - timedelta(days=1)).isoformat(),
+            (now + timedelta(days=1)).isoformat(),
         ).execute()
 
         for e in resp.get("items", []):
@@ -1,33 +1,74 @@
 # agents/base_agent.py
 import os
+import threading
+import time
 
-# Import openai lazily / defensively so the package is optional at import-time
-try:
-    import openai
-except Exception:
-    openai = None
+from .model_router import default_router
+
+# openai is imported lazily (on first ask) so importing the agents stays cheap
+# and the package stays optional at import-time
+openai = None
+
+
+def _load_openai():
+    global openai
+    if openai is None:
+        try:
+            import openai as _openai
+        except Exception:
+            return None
+        openai = _openai
+    return openai
+
+
+_router = None
+_router_lock = threading.Lock()
+
+
+def get_router():
+    """Router-ul de modele comun tuturor agenților (creat la primul apel, după load_dotenv)."""
+    global _router
+    if _router is None:
+        with _router_lock:
+            if _router is None:
+                _router = default_router()
+    return _router
 
 
 class BaseAgent:
     def __init__(self, name: str):
         self.name = name
+        # ce tier/model a răspuns ultima dată (diagnostic)
+        self.last_route = None
 
-    def ask(self, prompt: str):
+    def ask(self, prompt: str, task: str = None):
         """
         Use OpenAI to answer the prompt. If the `openai` package is not installed
         a RuntimeError is raised with a helpful message so imports won't fail.
+
+        The model is picked by the router from the `task` hint, the agent name or the prompt size;
+        slow answers are hedged with a duplicate request to a faster tier.
         """
-        if openai is None:
+        client = _load_openai()
+        if client is None:
             raise RuntimeError(
                 "openai package is not installed. Install it (pip install openai) to use BaseAgent.ask()"
             )
 
         # ensure API key is set at call time
-        openai.api_key = os.getenv("OPENAI_API_KEY")
-
-        response = openai.ChatCompletion.create(
-            model="gpt-5-nano",
-            messages=[{"role": "system", "content": f"You are {self.name} agent."},
-                      {"role": "user", "content": prompt}]
-        )
-        return response.choices[0].message["content"]
+        client.api_key = os.getenv("OPENAI_API_KEY")
+
+        def complete(model: str, timeout: float) -> str:
+            response = client.ChatCompletion.create(
+                model=model,
+                messages=[{"role": "system", "content": f"You are {self.name} agent."},
+                          {"role": "user", "content": prompt}],
+                request_timeout=timeout,
+            )
+            return response.choices[0].message["content"]
+
+        t0 = time.perf_counter()
+        content, tier, model = get_router().call(prompt, complete, task=task, agent=self.name)
+        self.last_route = {"tier": tier, "model": model,
+                           "latency_ms": round((time.perf_counter() - t0) * 1000, 2)}
+        return content
@@ -1,43 +1,62 @@
 # agents/calendar_agent.py
 """CalendarAgent wraps calendar functionality and (optionally) uses a
 GoogleCalendarAdapter if available. The Google adapter is imported
-defensively so the module can be imported even when google packages
-aren't installed (useful for local dev/tests).
+lazily, on first use, so the module can be imported even when google packages
+aren't installed (useful for local dev/tests) and so importing it stays cheap.
 """
+import threading
+
 from .base_agent import BaseAgent
 
-# Try to import the real Google adapter. During development you can swap to a mock by
-# editing this line, but the default is the real adapter which will prompt for OAuth
-try:
-    from adapters.google_calendar_adapter import GoogleCalendarAdapter
-except Exception:
-    # If import fails (missing google libs), fall back to None so the agent stays importable.
-    GoogleCalendarAdapter = None
+
+def _default_adapter_factory():
+    # Try to import the real Google adapter. During development you can swap to a mock by
+    # editing this function, but the default is the real adapter which will prompt for OAuth
+    try:
+        from adapters.google_calendar_adapter import GoogleCalendarAdapter
+    except Exception:
+        raise RuntimeError("GoogleCalendarAdapter not available (google packages may be missing)")
+    return GoogleCalendarAdapter()
 
 
 class CalendarAgent(BaseAgent):
-    def __init__(self, name="Calendar"):
+    def __init__(self, name="Calendar", adapter_provider=None):
+        """
+        adapter_provider: callable opțional care întoarce adapterul (sau None).
+        Dacă lipsește, adapterul Google e construit o singură dată, la primul acces.
+        """
         super().__init__(name)
-        # Instantiate adapter if available, otherwise leave as None.
-        if GoogleCalendarAdapter is not None:
-            try:
-                self.adapter = GoogleCalendarAdapter()
-                self._adapter_init_error = None
-            except Exception as e:
-                # If adapter initialization fails (missing credentials, libs, etc.), continue without it
-                self.adapter = None
-                # record the initialization error for diagnostics
-                self._adapter_init_error = str(e)
-        else:
-            self.adapter = None
-            self._adapter_init_error = "GoogleCalendarAdapter not available (google packages may be missing)"
+        self._adapter_provider = adapter_provider
+        self._adapter = None
+        self._adapter_loaded = False
+        self._adapter_init_error = None
+        self._adapter_lock = threading.Lock()
+
+    @property
+    def adapter(self):
+        if self._adapter_provider is not None:
+            return self._adapter_provider()
+        if not self._adapter_loaded:
+            with self._adapter_lock:
+                if not self._adapter_loaded:
+                    try:
+                        self._adapter = _default_adapter_factory()
+                        self._adapter_init_error = None
+                    except Exception as e:
+                        # If adapter initialization fails (missing credentials, libs, etc.), continue without it
+                        self._adapter = None
+                        # record the initialization error for diagnostics
+                        self._adapter_init_error = str(e)
+                    self._adapter_loaded = True
+        return self._adapter
 
     def schedule(self, workout_plan: str, meal_plan: str):
         # If we have an adapter, ask for upcoming events; otherwise proceed with empty events.
         events = []
-        if getattr(self, 'adapter', None) is not None:
+        adapter = self.adapter
+        if adapter is not None:
             try:
-                events = self.adapter.get_upcoming_events()
+                events = adapter.get_upcoming_events()
             except Exception:
                 events = []
 
@@ -51,4 +70,4 @@ class CalendarAgent(BaseAgent):
         Meal plan: {meal_plan}
         Suggest a daily schedule that fits around the existing events.
         """
-        return self.ask(prompt)
+        return self.ask(prompt, task="plan")
@@ -4,10 +4,11 @@ from .food_agent import FoodAgent
 from .calendar_agent import CalendarAgent  # presupunem că ai deja un calendar_agent
 
 class CoordinatorAgent:
-    def __init__(self):
-        self.fitness_agent = FitnessAgent("Fitness")
-        self.food_agent = FoodAgent("Food")
-        self.calendar_agent = CalendarAgent("Calendar")
+    def __init__(self, fitness_agent=None, food_agent=None, calendar_agent=None):
+        # agenții pot fi injectați (ex. din registry) ca să nu existe instanțe paralele
+        self.fitness_agent = fitness_agent if fitness_agent is not None else FitnessAgent("Fitness")
+        self.food_agent = food_agent if food_agent is not None else FoodAgent("Food")
+        self.calendar_agent = calendar_agent if calendar_agent is not None else CalendarAgent("Calendar")
 
     def plan_day(self, goal: str, diet_pref: str):
         workout = self.fitness_agent.get_workout_plan(goal)
@@ -12,4 +12,4 @@ class FoodAgent(BaseAgent):
         Include breakfast, lunch, dinner, and optional snacks for each day.
         Make it varied and balanced.
         """
-        return self.ask(prompt)
+        return self.ask(prompt, task="plan")
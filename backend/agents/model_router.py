@@ -0,0 +1,157 @@
+# agents/model_router.py
+"""Model routing + hedged fallback for BaseAgent.ask.
+
+A route is chosen per call: an explicit task hint wins, then a per-agent route,
+then prompt size (short prompts -> "edit", the rest -> "plan"). A route defines
+an ordered list of model tiers, when to hedge, and an overall latency budget.
+The first tier is called; if it has not answered after `hedge_after` seconds,
+the same prompt is sent to the next tier (only if that tier is a *different*
+model) and whichever answers first wins. If a tier fails, the next one is tried
+immediately. The winning tier is recorded for diagnostics.
+
+Every attempt runs on its own daemon thread rather than a shared pool, so a slow
+model can never queue a hedge behind it (and there is no per-process cap on
+calls in flight, as before routing). A losing attempt is not cancelled; it ends
+on its own `request_timeout`.
+"""
+import os
+import threading
+import time
+from concurrent.futures import Future, FIRST_COMPLETED, wait
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+class Route:
+    def __init__(self, name: str, tiers: List[str], budget: float, hedge_after: Optional[float] = None):
+        self.name = name
+        self.tiers = tiers
+        self.budget = budget
+        self.hedge_after = hedge_after
+
+
+class ModelRouter:
+    def __init__(self, tiers: Dict[str, str], routes: Dict[str, Route],
+                 agent_routes: Optional[Dict[str, str]] = None, edit_max_chars: int = 600):
+        self.tiers = tiers
+        self.routes = routes
+        self.agent_routes = agent_routes or {}
+        self.edit_max_chars = edit_max_chars
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def select(self, prompt: str, task: Optional[str] = None, agent: Optional[str] = None) -> Route:
+        """Ordinea: `task` explicit -> ruta agentului -> mărimea promptului."""
+        if task in self.routes:
+            return self.routes[task]
+        if agent in self.agent_routes:
+            return self.routes[self.agent_routes[agent]]
+        return self.routes["edit"] if len(prompt) <= self.edit_max_chars else self.routes["plan"]
+
+    @staticmethod
+    def _spawn(fn: Callable, *args) -> Future:
+        fut: Future = Future()
+
+        def _run():
+            if not fut.set_running_or_notify_cancel():
+                return
+            try:
+                fut.set_result(fn(*args))
+            except BaseException as e:
+                fut.set_exception(e)
+
+        threading.Thread(target=_run, name="model-router-call", daemon=True).start()
+        return fut
+
+    def _record(self, route: str, outcome: str):
+        with self._lock:
+            per_route = self._stats.setdefault(route, {})
+            per_route[outcome] = per_route.get(outcome, 0) + 1
+
+    def call(self, prompt: str, complete: Callable[[str, float], str],
+             task: Optional[str] = None, agent: Optional[str] = None) -> Tuple[str, str, str]:
+        """
+        complete(model, timeout) -> text. Întoarce (text, tier, model).
+        Aruncă TimeoutError dacă niciun tier nu răspunde în bugetul rutei,
+        sau ultima excepție dacă toate tier-urile au eșuat.
+        """
+        route = self.select(prompt, task, agent)
+        deadline = time.monotonic() + route.budget
+        pending = {}
+        next_tier = 0
+        last_error: Optional[BaseException] = None
+
+        def launch():
+            nonlocal next_tier
+            tier = route.tiers[next_tier]
+            next_tier += 1
+            model = self.tiers[tier]
+            timeout = max(0.1, deadline - time.monotonic())
+            pending[self._spawn(complete, model, timeout)] = (tier, model)
+
+        launch()
+        while pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            # un hedge către același model doar dublează costul, nu ocolește degradarea
+            can_hedge = next_tier < len(route.tiers) and route.hedge_after is not None \
+                and self.tiers[route.tiers[next_tier]] not in {m for _, m in pending.values()}
+            timeout = min(remaining, route.hedge_after) if can_hedge else remaining
+            done, _ = wait(list(pending), timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                # deadline-ul de hedge a trecut: trimitem un duplicat către tier-ul următor
+                if can_hedge:
+                    self._record(route.name, "hedged")
+                    launch()
+                continue
+            for fut in done:
+                tier, model = pending.pop(fut)
+                try:
+                    text = fut.result()
+                except Exception as e:
+                    last_error = e
+                    self._record(route.name, f"error:{tier}")
+                    continue
+                self._record(route.name, f"answered:{tier}")
+                return text, tier, model
+            # toate cererile active au eșuat -> fallback imediat
+            if not pending and next_tier < len(route.tiers):
+                launch()
+
+        if pending:
+            self._record(route.name, "timeout")
+            raise TimeoutError(f"No model answered within {route.budget}s (route '{route.name}')")
+        raise last_error if last_error is not None else RuntimeError("No model tiers configured")
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {k: dict(v) for k, v in self._stats.items()}
+
+
+def default_router() -> ModelRouter:
+    """
+    Router configurat din env. Tier-ul primar rămâne modelul de dinainte (gpt-5-nano);
+    hedge-ul devine activ când MODEL_TIER_FAST indică un model diferit (mai rapid).
+    Cât timp cele două tier-uri sunt același model, nu se trimit duplicate.
+    """
+    tiers = {
+        "primary": os.getenv("MODEL_TIER_PRIMARY", "gpt-5-nano"),
+        "fast": os.getenv("MODEL_TIER_FAST", "gpt-5-nano"),
+    }
+    routes = {
+        # planuri complete / prompturi lungi
+        "plan": Route("plan", ["primary", "fast"],
+                      budget=float(os.getenv("MODEL_PLAN_BUDGET", "120")),
+                      hedge_after=float(os.getenv("MODEL_PLAN_HEDGE_AFTER", "20"))),
+        # prompturi scurte: întâi tier-ul rapid, cu fallback pe cel primar
+        "edit": Route("edit", ["fast", "primary"],
+                      budget=float(os.getenv("MODEL_EDIT_BUDGET", "60")),
+                      hedge_after=float(os.getenv("MODEL_EDIT_HEDGE_AFTER", "10"))),
+        # lucru în fundal (precalculare): latența nu contează, deci fără hedge / duplicate
+        "background": Route("background", ["primary"],
+                            budget=float(os.getenv("MODEL_BACKGROUND_BUDGET", "300"))),
+    }
+    # CalendarAgent.schedule combină două planuri complete, indiferent de mărimea promptului
+    agent_routes = {"Calendar": "plan"}
+    return ModelRouter(tiers, routes, agent_routes=agent_routes,
+                       edit_max_chars=int(os.getenv("MODEL_EDIT_MAX_CHARS", "600")))
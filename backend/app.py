@@ -1,26 +1,18 @@
 # backend/app.py
-from flask import Flask, request, jsonify, render_template, redirect, url_for
+import time
+_IMPORT_T0 = time.perf_counter()
+
+from flask import Flask, request, jsonify, render_template, redirect, url_for, g, Response
 from flask_cors import CORS
 from dotenv import load_dotenv
+import hmac
 import os
 from datetime import datetime, timedelta
 
-from agents.coordinator_agent import CoordinatorAgent
-
-try:
-    from adapters.google_calendar_adapter import GoogleCalendarAdapter
-except Exception:
-    GoogleCalendarAdapter = None
-
-try:
-    from agents.food_agent import FoodAgent
-except Exception:
-    FoodAgent = None
-
-try:
-    from agents.fitness_agent import FitnessAgent
-except Exception:
-    FitnessAgent = None
+from agents.base_agent import get_router
+from services.registry import AgentRegistry
+from services.precompute import PlanCache, PrecomputeScheduler
+from services.profiling import RouteProfiler
 
 
 # ==== Config .env & OpenAI ====
@@ -36,45 +28,93 @@ app = Flask(
 )
 CORS(app)
 
-coordinator = CoordinatorAgent()
+
+# ==== Agenți & adaptere (construite lazy, la prima utilizare) ====
+def _make_google_adapter():
+    from adapters.google_calendar_adapter import GoogleCalendarAdapter
+    return GoogleCalendarAdapter()
+
+
+def _make_food_agent():
+    from agents.food_agent import FoodAgent
+    return FoodAgent("Food")
+
+
+def _make_fitness_agent():
+    from agents.fitness_agent import FitnessAgent
+    return FitnessAgent("Fitness")
+
+
+def _make_calendar_agent():
+    from agents.calendar_agent import CalendarAgent
+    return CalendarAgent("Calendar", adapter_provider=resolve_google_adapter)
+
+
+def _make_coordinator():
+    from agents.coordinator_agent import CoordinatorAgent
+    return CoordinatorAgent(
+        fitness_agent=registry.get("fitness_agent"),
+        food_agent=registry.get("food_agent"),
+        calendar_agent=registry.get("calendar_agent"),
+    )
+
+
+registry = AgentRegistry()
+registry.register("google_adapter", _make_google_adapter,
+                  retry_after=float(os.getenv("CALENDAR_RETRY_AFTER", "300")))
+registry.register("food_agent", _make_food_agent)
+registry.register("fitness_agent", _make_fitness_agent)
+registry.register("calendar_agent", _make_calendar_agent)
+registry.register("coordinator", _make_coordinator)
 
 
-_google_adapter_singleton = None
 def resolve_google_adapter():
-    """1) din coordinator.calendar_agent.adapter; 2) lazy singleton local."""
-    global _google_adapter_singleton
-    cal_agent = getattr(coordinator, "calendar_agent", None)
-    if cal_agent is not None:
-        adapter = getattr(cal_agent, "adapter", None)
-        if adapter is not None:
-            return adapter
-    if _google_adapter_singleton is None and GoogleCalendarAdapter is not None:
-        _google_adapter_singleton = GoogleCalendarAdapter()
-    return _google_adapter_singleton
-
-
-_food_agent_singleton = None
+    """Adapterul Google Calendar (lazy, partajat) sau None dacă nu e disponibil."""
+    return registry.get("google_adapter")
+
+
+CALENDAR_WAIT_SECONDS = float(os.getenv("CALENDAR_WAIT_SECONDS", "5"))
+
+
+def resolve_google_adapter_bounded():
+    """
+    Ca resolve_google_adapter, dar așteaptă cel mult CALENDAR_WAIT_SECONDS după init
+    (ex. OAuth blocat). Dacă init-ul a eșuat recent (backoff) -> None imediat.
+    Folosit unde calendarul e doar context opțional (food/fitness).
+    """
+    return registry.get_within("google_adapter", CALENDAR_WAIT_SECONDS)
+
+
+def calendar_unavailable_reason():
+    """De ce nu s-a folosit calendarul (pentru răspunsurile food/fitness), sau None."""
+    state = registry.state("google_adapter")
+    if state == "loading":
+        return "calendar adapter still initializing"
+    if state == "failed":
+        return registry.error("google_adapter")
+    return None
+
+
 def resolve_food_agent():
-    """1) din coordinator.food_agent; 2) lazy singleton local."""
-    global _food_agent_singleton
-    fa = getattr(coordinator, "food_agent", None)
-    if fa is not None:
-        return fa
-    if _food_agent_singleton is None and FoodAgent is not None:
-        _food_agent_singleton = FoodAgent()
-    return _food_agent_singleton
+    return registry.get("food_agent")
 
 
-_fitness_agent_singleton = None
 def resolve_fitness_agent():
-    """1) din coordinator.fitness_agent; 2) lazy singleton local."""
-    global _fitness_agent_singleton
-    fa = getattr(coordinator, "fitness_agent", None)
-    if fa is not None:
-        return fa
-    if _fitness_agent_singleton is None and FitnessAgent is not None:
-        _fitness_agent_singleton = FitnessAgent()
-    return _fitness_agent_singleton
+    return registry.get("fitness_agent")
+
+
+def resolve_coordinator():
+    return registry.get("coordinator")
+
+
+def warm_up(names=None):
+    """
+    Construiește componentele înainte de primul request. Erorile sunt doar înregistrate.
+    Pentru servere pre-fork apelează-l în fiecare worker (gunicorn `post_fork`), nu în master
+    (`on_starting`/`--preload`): adapterul Google ține un transport httplib2 care nu e sigur
+    nici după fork, nici partajat între procese.
+    """
+    return registry.warm_up(names)
 
 
 def _parse_any_iso(s: str):
@@ -89,13 +129,21 @@ def _parse_any_iso(s: str):
         return None
 
 
-def build_calendar_context_for_next_days(adapter, days: int = 7, max_per_day: int = 8) -> str:
-    """Context compact cu programul din următoarele `days` zile pentru adaptare plan."""
-    now = datetime.now().astimezone()
-    limit = now + timedelta(days=days)
+def build_calendar_context_for_next_days(adapter, days: int = 7, max_per_day: int = 8, start_day=None) -> str:
+    """
+    Context compact cu programul din următoarele `days` zile pentru adaptare plan.
+    Fereastra e aliniată pe zile (de la miezul nopții lui `start_day`, implicit azi), așa că
+    textul nu se schimbă când începe un eveniment, doar când se schimbă calendarul sau ziua.
+    """
+    local_tz = datetime.now().astimezone().tzinfo
+    start_day = start_day or datetime.now().astimezone().date()
+    window_start = datetime.combine(start_day, datetime.min.time()).replace(tzinfo=local_tz)
+    limit = window_start + timedelta(days=days)
 
     events = []
-    if hasattr(adapter, "get_now_and_upcoming"):
+    if hasattr(adapter, "get_events_between"):
+        events = adapter.get_events_between(window_start.isoformat(), limit.isoformat(), cap=400)
+    elif hasattr(adapter, "get_now_and_upcoming"):
         data = adapter.get_now_and_upcoming(limit_upcoming=400) or {}
         if data.get("current"):
             events.append(data["current"])
@@ -108,7 +156,7 @@ def build_calendar_context_for_next_days(adapter, days: int = 7, max_per_day: in
     filtered = []
     for e in events:
         s = _parse_any_iso(e.get("start"))
-        if not s or s < now or s > limit:
+        if not s or s < window_start or s >= limit:
             continue
         filtered.append(e)
 
@@ -136,6 +184,125 @@ def build_calendar_context_for_next_days(adapter, days: int = 7, max_per_day: in
     return "\n".join(lines)
 
 
+def calendar_context_for_plans(start_day=None) -> str:
+    """
+    Contextul de calendar pe 7 zile folosit de food/fitness ("" dacă adapterul lipsește sau eșuează).
+    `start_day` (implicit azi) permite precalcularea ferestrei de mâine.
+    """
+    adapter = resolve_google_adapter_bounded()
+    if adapter is None:
+        return ""
+    try:
+        return build_calendar_context_for_next_days(adapter, days=7, max_per_day=8, start_day=start_day)
+    except Exception:
+        return ""
+
+
+def build_food_prompt(diet_pref: str, user_prompt: str, calendar_ctx: str) -> str:
+    if user_prompt:
+        ctx = []
+        if diet_pref: ctx.append(f"Dietary preference: {diet_pref}.")
+        if calendar_ctx: ctx.append(calendar_ctx)
+        return (("\n\n".join(ctx) + "\n\n") if ctx else "") + \
+            "Task: " + user_prompt + "\n\n" + \
+            "Adapt to the schedule above; quick/portable meals on packed days; batch-cooking on lighter days."
+    pref = diet_pref if diet_pref else "balanced"
+    return (f"Dietary preference: {pref}.\n" if pref else "") + \
+        (calendar_ctx + "\n\n" if calendar_ctx else "") + \
+        "You are a nutrition expert. Create a 7-day meal plan adapted to the user's calendar above. " \
+        "Include breakfast, lunch, dinner, snacks; quick meals on busy days; batch-cooking on free days."
+
+
+def build_fitness_prompt(goal: str, experience: str, equipment: str, injuries: str,
+                         user_prompt: str, calendar_ctx: str) -> str:
+    if user_prompt:
+        # compunem contextul fix
+        ctx_parts = []
+        if goal:       ctx_parts.append(f"Fitness goal: {goal}.")
+        if experience: ctx_parts.append(f"Experience level: {experience}.")
+        if equipment:  ctx_parts.append(f"Available equipment: {equipment}.")
+        if injuries:   ctx_parts.append(f"Injury/limitations: {injuries}.")
+        if calendar_ctx: ctx_parts.append(calendar_ctx)
+        ctx_block = "\n".join(ctx_parts).strip()
+        return (ctx_block + "\n\n" if ctx_block else "") + \
+            f"Task: {user_prompt}\n\n" \
+            "Please adapt to the user's calendar: schedule short, efficient sessions on busy days " \
+            "(e.g., 20–30 min EMOM/AMRAP or circuit), longer sessions on lighter days; " \
+            "include warm-up, cool-down, and weekly progression guidance."
+    # prompt implicit 7 zile
+    base_goal = goal if goal else "general fitness"
+    return \
+        (f"Fitness goal: {base_goal}.\n" if base_goal else "") + \
+        (f"Experience level: {experience}.\n" if experience else "") + \
+        (f"Available equipment: {equipment}.\n" if equipment else "") + \
+        (f"Injury/limitations: {injuries}.\n" if injuries else "") + \
+        (calendar_ctx + "\n\n" if calendar_ctx else "") + \
+        "You are a strength & conditioning coach. Build a 7-day workout plan ADAPTED to the calendar above. " \
+        "Specify for each day: session type, main exercises (sets x reps or time), intensity/RPE, and duration. " \
+        "On packed days propose short 20–30 min routines; on free days include longer sessions. " \
+        "Include warm-up and cool-down guidance, plus weekly progression tips."
+
+
+# ==== Precalculare planuri (opt-in: PRECOMPUTE_ENABLED=1) ====
+# Bugetul și cache-ul sunt per proces: cu N workeri pre-fork costul maxim e N x PRECOMPUTE_DAILY_TOKENS,
+# deci împarte bugetul la numărul de workeri (sau rulează precalcularea într-un singur worker).
+plan_cache = PlanCache(ttl=float(os.getenv("PRECOMPUTE_TTL", str(48 * 3600))))
+precompute = PrecomputeScheduler(
+    plan_cache,
+    kinds={
+        "food": (lambda p, cal: build_food_prompt(p["diet_pref"], "", cal), resolve_food_agent),
+        "fitness": (lambda p, cal: build_fitness_prompt(p["goal"], p["experience"], p["equipment"],
+                                                        p["injuries"], "", cal), resolve_fitness_agent),
+    },
+    calendar_context=calendar_context_for_plans,
+    daily_token_budget=int(os.getenv("PRECOMPUTE_DAILY_TOKENS", "100000")),
+    interval=float(os.getenv("PRECOMPUTE_INTERVAL", "300")),
+)
+PRECOMPUTE_ENABLED = os.getenv("PRECOMPUTE_ENABLED", "").lower() in ("1", "true", "yes")
+
+
+@app.before_request
+def _precompute_track_start():
+    if PRECOMPUTE_ENABLED:
+        # pornit la primul request (per proces), ca să supraviețuiască fork-ului
+        precompute.start()
+    precompute.request_started()
+
+
+@app.teardown_request
+def _precompute_track_end(exc=None):
+    precompute.request_finished()
+
+
+def _remember_for_precompute(kind: str, params: dict, served_prompt: str):
+    if PRECOMPUTE_ENABLED:
+        precompute.remember(kind, params, served_prompt=served_prompt)
+
+
+# ==== Profilare (opt-in: PROFILING_ENABLED=1; endpoint-urile de admin cer și ADMIN_TOKEN) ====
+# Per request: header `X-Profile: 1`; global: PROFILING_SAMPLE_RATE (0..1).
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "").lower() in ("1", "true", "yes")
+profiler = RouteProfiler(
+    mode=os.getenv("PROFILING_MODE", "sample"),
+    sample_rate=float(os.getenv("PROFILING_SAMPLE_RATE", "0")),
+    interval=float(os.getenv("PROFILING_INTERVAL", "0.005")),
+)
+
+
+@app.before_request
+def _profiling_start():
+    if not PROFILING_ENABLED or request.endpoint in (None, "static") \
+            or request.path.startswith("/api/admin/"):
+        return
+    if profiler.should_profile(request.headers.get("X-Profile")):
+        g.profile_token = profiler.start(request.endpoint)
+
+
+@app.teardown_request
+def _profiling_stop(exc=None):
+    profiler.stop(g.pop("profile_token", None))
+
+
 # ========================= API: Planner =========================
 @app.route("/plan", methods=["POST"])
 def create_plan():
@@ -148,6 +315,9 @@ def create_plan():
         return jsonify({"error": "Missing field: goal"}), 400
     if not diet_pref:
         return jsonify({"error": "Missing field: diet_pref"}), 400
+    coordinator = resolve_coordinator()
+    if coordinator is None:
+        return jsonify({"error": registry.error("coordinator") or "CoordinatorAgent indisponibil"}), 500
     try:
         plan = coordinator.plan_day(goal, diet_pref)
         return jsonify(plan), 201
@@ -162,7 +332,8 @@ def get_events():
         max_results = request.args.get("max_results", default=10, type=int)
         adapter = resolve_google_adapter()
         if adapter is None:
-            return jsonify({"events": [], "adapter_present": False, "adapter_error": "calendar adapter not available"}), 200
+            return jsonify({"events": [], "adapter_present": False,
+                            "adapter_error": registry.error("google_adapter") or "calendar adapter not available"}), 200
 
         if hasattr(adapter, "get_upcoming_events"):
             events = adapter.get_upcoming_events(max_results=max_results)
@@ -241,32 +412,24 @@ def api_food_generate():
     if agent is None:
         return jsonify({"error": "FoodAgent indisponibil"}), 500
 
-    calendar_ctx = ""
-    adapter = resolve_google_adapter()
-    if adapter is not None:
-        try:
-            calendar_ctx = build_calendar_context_for_next_days(adapter, days=7, max_per_day=8)
-        except Exception:
-            calendar_ctx = ""
+    calendar_ctx = calendar_context_for_plans()
 
     try:
-        if user_prompt:
-            ctx = []
-            if diet_pref: ctx.append(f"Dietary preference: {diet_pref}.")
-            if calendar_ctx: ctx.append(calendar_ctx)
-            final_prompt = (("\n\n".join(ctx) + "\n\n") if ctx else "") + \
-                "Task: " + user_prompt + "\n\n" + \
-                "Adapt to the schedule above; quick/portable meals on packed days; batch-cooking on lighter days."
-            content = agent.ask(final_prompt)
-        else:
-            pref = diet_pref if diet_pref else "balanced"
-            final_prompt = (f"Dietary preference: {pref}.\n" if pref else "") + \
-                (calendar_ctx + "\n\n" if calendar_ctx else "") + \
-                "You are a nutrition expert. Create a 7-day meal plan adapted to the user's calendar above. " \
-                "Include breakfast, lunch, dinner, snacks; quick meals on busy days; batch-cooking on free days."
-            content = agent.ask(final_prompt)
-
-        return jsonify({"diet_pref": diet_pref or None, "used_calendar": bool(calendar_ctx), "content": content}), 200
+        final_prompt = build_food_prompt(diet_pref, user_prompt, calendar_ctx)
+        content = None
+        if not user_prompt:
+            content = plan_cache.take(final_prompt)
+        precomputed = content is not None
+        if content is None:
+            # fără prompt liber -> plan complet pe 7 zile; altfel ruta după mărime (edit are fallback)
+            content = agent.ask(final_prompt, task=None if user_prompt else "plan")
+        if not user_prompt:
+            # promptul tocmai servit nu mai trebuie precalculat
+            _remember_for_precompute("food", {"diet_pref": diet_pref}, final_prompt)
+
+        return jsonify({"diet_pref": diet_pref or None, "used_calendar": bool(calendar_ctx),
+                        "calendar_error": None if calendar_ctx else calendar_unavailable_reason(),
+                        "precomputed": precomputed, "content": content}), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -285,7 +448,8 @@ def api_fitness_generate():
     }
     - Citește automat programul din calendar pe 7 zile.
     - Dacă `prompt` e prezent -> îl folosește împreună cu contextul.
-    - Altfel -> generează un plan pe 7 zile (workout split) adaptat programului.
+    - Altfel -> generează un plan pe 7 zile (workout split) adaptat programului
+      (servit din cache-ul de precalculare dacă există deja).
     """
     data = request.get_json(silent=True) or {}
     goal        = (data.get("goal") or "").strip()
@@ -299,45 +463,20 @@ def api_fitness_generate():
         return jsonify({"error": "FitnessAgent indisponibil"}), 500
 
     # context din calendar
-    calendar_ctx = ""
-    adapter = resolve_google_adapter()
-    if adapter is not None:
-        try:
-            calendar_ctx = build_calendar_context_for_next_days(adapter, days=7, max_per_day=8)
-        except Exception:
-            calendar_ctx = ""
-
-    # compunem contextul fix
-    ctx_parts = []
-    if goal:       ctx_parts.append(f"Fitness goal: {goal}.")
-    if experience: ctx_parts.append(f"Experience level: {experience}.")
-    if equipment:  ctx_parts.append(f"Available equipment: {equipment}.")
-    if injuries:   ctx_parts.append(f"Injury/limitations: {injuries}.")
-    if calendar_ctx: ctx_parts.append(calendar_ctx)
-    ctx_block = "\n".join(ctx_parts).strip()
+    calendar_ctx = calendar_context_for_plans()
 
     try:
-        if user_prompt:
-            final_prompt = (ctx_block + "\n\n" if ctx_block else "") + \
-                f"Task: {user_prompt}\n\n" \
-                "Please adapt to the user's calendar: schedule short, efficient sessions on busy days " \
-                "(e.g., 20–30 min EMOM/AMRAP or circuit), longer sessions on lighter days; " \
-                "include warm-up, cool-down, and weekly progression guidance."
-            content = agent.ask(final_prompt)
-        else:
-            # prompt implicit 7 zile
-            base_goal = goal if goal else "general fitness"
-            final_prompt = \
-                (f"Fitness goal: {base_goal}.\n" if base_goal else "") + \
-                (f"Experience level: {experience}.\n" if experience else "") + \
-                (f"Available equipment: {equipment}.\n" if equipment else "") + \
-                (f"Injury/limitations: {injuries}.\n" if injuries else "") + \
-                (calendar_ctx + "\n\n" if calendar_ctx else "") + \
-                "You are a strength & conditioning coach. Build a 7-day workout plan ADAPTED to the calendar above. " \
-                "Specify for each day: session type, main exercises (sets x reps or time), intensity/RPE, and duration. " \
-                "On packed days propose short 20–30 min routines; on free days include longer sessions. " \
-                "Include warm-up and cool-down guidance, plus weekly progression tips."
-            content = agent.ask(final_prompt)
+        final_prompt = build_fitness_prompt(goal, experience, equipment, injuries, user_prompt, calendar_ctx)
+        content = None
+        if not user_prompt:
+            content = plan_cache.take(final_prompt)
+        precomputed = content is not None
+        if content is None:
+            # fără prompt liber -> plan complet pe 7 zile; altfel ruta după mărime (edit are fallback)
+            content = agent.ask(final_prompt, task=None if user_prompt else "plan")
+        if not user_prompt:
+            _remember_for_precompute("fitness", {"goal": goal, "experience": experience,
+                                                 "equipment": equipment, "injuries": injuries}, final_prompt)
 
         return jsonify({
             "goal": goal or None,
@@ -345,12 +484,66 @@ def api_fitness_generate():
             "equipment": equipment or None,
             "injuries": injuries or None,
             "used_calendar": bool(calendar_ctx),
+            "calendar_error": None if calendar_ctx else calendar_unavailable_reason(),
+            "precomputed": precomputed,
             "content": content
         }), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
+# ========================= API: Status =========================
+@app.route("/api/status/agents", methods=["GET"])
+def api_status_agents():
+    """Starea componentelor lazy + timpul de import al aplicației (ms)."""
+    return jsonify({"import_ms": IMPORT_MS, "components": registry.status(),
+                    "precompute": precompute.status(), "model_routes": get_router().stats()}), 200
+
+
+# ========================= API: Admin (profilare) =========================
+def _admin_denied():
+    # fără ADMIN_TOKEN configurat endpoint-urile de admin sunt închise (CORS permite orice origine)
+    token = os.getenv("ADMIN_TOKEN", "")
+    given = request.headers.get("X-Admin-Token", "")
+    if not token or not hmac.compare_digest(given.encode("utf-8"), token.encode("utf-8")):
+        return jsonify({"error": "forbidden"}), 403
+    if not PROFILING_ENABLED:
+        return jsonify({"error": "profiling disabled (set PROFILING_ENABLED=1)"}), 404
+    return None
+
+
+@app.route("/api/admin/profiles", methods=["GET", "DELETE"])
+def api_admin_profiles():
+    """
+    GET    -> rezumat agregat per rută (JSON); `?format=collapsed` -> stack-uri pentru flame graph.
+    DELETE -> resetează profilele.
+    """
+    denied = _admin_denied()
+    if denied:
+        return denied
+    if request.method == "DELETE":
+        profiler.reset()
+        return jsonify({"reset": True}), 200
+    if request.args.get("format") == "collapsed":
+        return Response(profiler.collapsed(), mimetype="text/plain")
+    top = request.args.get("top", default=15, type=int)
+    return jsonify({"mode": profiler.mode, "sample_rate": profiler.sample_rate,
+                    "routes": profiler.summary(top=top)}), 200
+
+
+@app.route("/api/admin/profiles/<endpoint>", methods=["GET"])
+def api_admin_profile_route(endpoint):
+    """`?format=collapsed` (implicit) sau `?format=pstats&sort=tottime` pentru modul cprofile."""
+    denied = _admin_denied()
+    if denied:
+        return denied
+    if request.args.get("format") == "pstats":
+        text = profiler.pstats_text(endpoint, sort=request.args.get("sort", "cumulative"))
+    else:
+        text = profiler.collapsed(endpoint)
+    return Response(text, mimetype="text/plain")
+
+
 # ========================= Front-end (templates) =========================
 @app.route("/")
 def index_page():
@@ -373,6 +566,11 @@ def fitness_page():
     return render_template("fitness.html")
 
 
+IMPORT_MS = round((time.perf_counter() - _IMPORT_T0) * 1000, 2)
+
+
 # ========================= Run =========================
 if __name__ == "__main__":
+    if os.getenv("WARM_UP", "").lower() in ("1", "true", "yes"):
+        warm_up()
     app.run(host="0.0.0.0", port=int(os.getenv("PORT", "5000")), debug=True)
@@ -0,0 +1,222 @@
+# services/precompute.py
+"""Speculative precomputation of the default 7-day plans.
+
+Plans are keyed by the exact prompt the endpoint would send, so a cached plan
+is only served when the user's parameters *and* the calendar context are
+identical to what was precomputed. The calendar context is day-aligned, so the
+prompt only changes when the schedule changes or the day rolls over. The
+scheduler re-reads the calendar every `interval` seconds, regenerates plans
+whose prompt changed, and also prepares the plans for the window starting
+tomorrow, so they are ready before the rollover.
+
+Budget and cache are per process.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, timedelta
+from typing import Callable, Dict, Optional, Tuple
+
+
+def _key(prompt: str) -> str:
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimare grosieră (~4 caractere / token), suficientă pentru buget."""
+    return max(1, len(text or "") // 4)
+
+
+class PlanCache:
+    """Cache thread-safe prompt -> plan, cu TTL și număr maxim de intrări."""
+
+    def __init__(self, ttl: float = 24 * 3600, max_entries: int = 256):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._items: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, prompt: str, content: str):
+        with self._lock:
+            k = _key(prompt)
+            self._items[k] = (content, time.time())
+            self._items.move_to_end(k)
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+
+    def take(self, prompt: str) -> Optional[str]:
+        """Scoate planul din cache (o singură servire; următorul 'regenerate' e proaspăt)."""
+        with self._lock:
+            item = self._items.pop(_key(prompt), None)
+        if item is None:
+            return None
+        content, created = item
+        if time.time() - created > self.ttl:
+            return None
+        return content
+
+    def __len__(self):
+        with self._lock:
+            return len(self._items)
+
+
+class PrecomputeScheduler:
+    """
+    Worker de fundal (un singur thread daemon) care rulează doar când aplicația e idle.
+
+    kinds: {"food": (build_prompt(params, calendar_ctx) -> str, resolve_agent() -> agent)}
+    calendar_context: (start_day) -> str, același context pe care îl folosesc endpoint-urile.
+    """
+
+    def __init__(self, cache: PlanCache, kinds: Dict[str, Tuple[Callable, Callable]],
+                 calendar_context: Callable[[], str], daily_token_budget: int = 100000,
+                 interval: float = 900.0, idle_grace: float = 5.0, max_profiles: int = 16):
+        self.cache = cache
+        self.kinds = kinds
+        self.calendar_context = calendar_context
+        self.daily_token_budget = daily_token_budget
+        self.interval = interval
+        self.idle_grace = idle_grace
+        self.max_profiles = max_profiles
+
+        self._profiles: "OrderedDict[Tuple[str, Tuple], dict]" = OrderedDict()
+        self._done: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._active = 0
+        self._last_activity = 0.0
+        self._budget_day = date.today()
+        self._tokens_used = 0
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.stats = {"generated": 0, "skipped_budget": 0, "errors": 0, "last_run": None}
+
+    # ---------------- Semnale din request-uri ----------------
+    def remember(self, kind: str, params: dict, served_prompt: Optional[str] = None):
+        """
+        Ține minte parametrii unei cereri implicite ca s-o putem precalcula data viitoare.
+        `served_prompt` (tocmai generat/servit) e marcat ca făcut, ca să nu fie regenerat imediat.
+        """
+        pk = (kind, tuple(sorted(params.items())))
+        with self._lock:
+            self._profiles[pk] = dict(params)
+            self._profiles.move_to_end(pk)
+            while len(self._profiles) > self.max_profiles:
+                self._profiles.popitem(last=False)
+            if served_prompt:
+                self._done[_key(served_prompt)] = time.time()
+
+    def request_started(self):
+        with self._lock:
+            self._active += 1
+            self._last_activity = time.monotonic()
+
+    def request_finished(self):
+        with self._lock:
+            self._active = max(0, self._active - 1)
+            self._last_activity = time.monotonic()
+
+    def _is_idle(self) -> bool:
+        with self._lock:
+            return self._active == 0 and (time.monotonic() - self._last_activity) >= self.idle_grace
+
+    # ---------------- Buget ----------------
+    def _budget_left(self) -> int:
+        today = date.today()
+        with self._lock:
+            if today != self._budget_day:
+                self._budget_day = today
+                self._tokens_used = 0
+            return self.daily_token_budget - self._tokens_used
+
+    def _spend(self, tokens: int):
+        with self._lock:
+            self._tokens_used += tokens
+
+    # ---------------- Worker ----------------
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="plan-precompute", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def _loop(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            if self._stop.is_set():
+                break
+            # cedează prioritatea request-urilor: așteaptă să fie aplicația idle
+            while not self._is_idle() and not self._stop.is_set():
+                time.sleep(self.idle_grace)
+            try:
+                self.run_once()
+            except Exception:
+                self.stats["errors"] += 1
+
+    def run_once(self) -> int:
+        """
+        O trecere: recitește calendarul și generează planurile lipsă, întâi pentru fereastra
+        de azi, apoi pentru cea de mâine. Întoarce nr. de planuri noi.
+        """
+        self.stats["last_run"] = time.time()
+        with self._lock:
+            profiles = list(self._profiles.items())
+            # uită cheile vechi (calendarul/fereastra s-au schimbat între timp)
+            cutoff = time.time() - self.cache.ttl
+            self._done = {k: t for k, t in self._done.items() if t >= cutoff}
+        if not profiles:
+            return 0
+
+        today = date.today()
+        generated = 0
+        for start_day in (today, today + timedelta(days=1)):
+            calendar_ctx = self.calendar_context(start_day) or ""
+            for (kind, _), params in profiles:
+                if self._stop.is_set() or not self._is_idle():
+                    return generated
+                build_prompt, resolve_agent = self.kinds[kind]
+                prompt = build_prompt(params, calendar_ctx)
+                k = _key(prompt)
+                with self._lock:
+                    if k in self._done:
+                        continue
+                # estimăm prompt + un răspuns de mărime similară
+                if self._budget_left() < 2 * estimate_tokens(prompt):
+                    self.stats["skipped_budget"] += 1
+                    return generated
+                agent = resolve_agent()
+                if agent is None:
+                    continue
+                try:
+                    # ruta "background" nu trimite hedge-uri, deci bugetul numără un singur apel
+                    content = agent.ask(prompt, task="background")
+                except Exception:
+                    self.stats["errors"] += 1
+                    continue
+                self._spend(estimate_tokens(prompt) + estimate_tokens(content))
+                self.cache.put(prompt, content)
+                with self._lock:
+                    self._done[k] = time.time()
+                self.stats["generated"] += 1
+                generated += 1
+        return generated
+
+    def status(self) -> dict:
+        with self._lock:
+            profiles = len(self._profiles)
+            used = self._tokens_used
+        return {
+            "running": self._thread is not None and self._thread.is_alive(),
+            "profiles": profiles,
+            "cached_plans": len(self.cache),
+            "tokens_used_today": used,
+            "daily_token_budget": self.daily_token_budget,
+            **self.stats,
+        }
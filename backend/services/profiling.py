@@ -0,0 +1,179 @@
+# services/profiling.py
+"""Opt-in per-route profiling for the Flask app.
+
+Two modes:
+  - "cprofile": deterministic profile of the request thread (pstats aggregated per route);
+  - "sample":   a background sampler records the request thread's stack every
+                `interval` seconds; stacks are aggregated in the "collapsed" format
+                (`a;b;c 42`) understood by flamegraph.pl and speedscope.
+
+A request is profiled when it carries the toggle header or is picked by the
+global sample rate. Everything is kept in memory and exposed via `summary()`,
+`collapsed()` and `pstats_text()`.
+"""
+import cProfile
+import io
+import pstats
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, Optional
+
+
+class _RouteProfile:
+    def __init__(self):
+        self.requests = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.stats: Optional[pstats.Stats] = None
+        self.stacks: Counter = Counter()
+
+
+class RouteProfiler:
+    def __init__(self, mode: str = "sample", sample_rate: float = 0.0, interval: float = 0.005):
+        if mode not in ("sample", "cprofile"):
+            raise ValueError(f"Unknown profiling mode: {mode}")
+        self.mode = mode
+        self.sample_rate = sample_rate
+        self.interval = interval
+        self._routes: Dict[str, _RouteProfile] = {}
+        self._lock = threading.Lock()
+        # cProfile nu poate rula în paralel pe mai multe thread-uri (Python 3.12+)
+        self._cprofile_lock = threading.Lock()
+        # thread ident -> route, pentru sampler
+        self._active: Dict[int, str] = {}
+        # setat cât timp există request-uri profilate; samplerul doarme altfel
+        self._has_active = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+
+    def should_profile(self, header_value: Optional[str]) -> bool:
+        if header_value is not None:
+            return header_value.strip().lower() in ("1", "true", "yes", "on")
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    # ---------------- Start / stop per request ----------------
+    def start(self, route: str) -> Optional[dict]:
+        """Întoarce un token de trecut la stop(), sau None dacă request-ul nu poate fi profilat."""
+        token = {"route": route, "t0": time.perf_counter(), "profile": None}
+        if self.mode == "cprofile":
+            if not self._cprofile_lock.acquire(blocking=False):
+                return None
+            prof = cProfile.Profile()
+            try:
+                prof.enable()
+            except ValueError:
+                # alt profiler activ (ex. debugger)
+                self._cprofile_lock.release()
+                return None
+            token["profile"] = prof
+        else:
+            self._ensure_sampler()
+            with self._lock:
+                self._active[threading.get_ident()] = route
+                self._has_active.set()
+        return token
+
+    def stop(self, token: Optional[dict]):
+        if token is None:
+            return
+        elapsed_ms = (time.perf_counter() - token["t0"]) * 1000
+        prof = token["profile"]
+        if prof is not None:
+            prof.disable()
+            self._cprofile_lock.release()
+        else:
+            with self._lock:
+                self._active.pop(threading.get_ident(), None)
+                if not self._active:
+                    self._has_active.clear()
+
+        with self._lock:
+            rp = self._routes.setdefault(token["route"], _RouteProfile())
+            rp.requests += 1
+            rp.total_ms += elapsed_ms
+            rp.max_ms = max(rp.max_ms, elapsed_ms)
+            if prof is not None:
+                if rp.stats is None:
+                    rp.stats = pstats.Stats(prof, stream=io.StringIO())
+                else:
+                    rp.stats.add(prof)
+
+    # ---------------- Sampler ----------------
+    def _ensure_sampler(self):
+        if self._sampler is not None and self._sampler.is_alive():
+            return
+        with self._lock:
+            if self._sampler is not None and self._sampler.is_alive():
+                return
+            self._sampler = threading.Thread(target=self._sample_loop, name="route-profiler", daemon=True)
+            self._sampler.start()
+
+    def _sample_loop(self):
+        while True:
+            self._has_active.wait()
+            time.sleep(self.interval)
+            with self._lock:
+                active = dict(self._active)
+            if not active:
+                continue
+            frames = sys._current_frames()
+            for ident, route in active.items():
+                frame = frames.get(ident)
+                if frame is None:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({code.co_filename.rsplit('/', 1)[-1]}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                collapsed = ";".join(reversed(stack))
+                with self._lock:
+                    rp = self._routes.setdefault(route, _RouteProfile())
+                    rp.stacks[collapsed] += 1
+
+    # ---------------- Raportare ----------------
+    def summary(self, top: int = 15) -> Dict[str, dict]:
+        out = {}
+        with self._lock:
+            items = list(self._routes.items())
+        for route, rp in items:
+            entry = {
+                "requests": rp.requests,
+                "mean_ms": round(rp.total_ms / rp.requests, 2) if rp.requests else None,
+                "max_ms": round(rp.max_ms, 2),
+            }
+            if rp.stats is not None:
+                rows = sorted(rp.stats.stats.items(), key=lambda kv: kv[1][3], reverse=True)[:top]
+                entry["top_cumulative"] = [
+                    {"function": f"{fn} ({file.rsplit('/', 1)[-1]}:{line})", "ncalls": nc,
+                     "tottime_ms": round(tt * 1000, 3), "cumtime_ms": round(ct * 1000, 3)}
+                    for (file, line, fn), (_, nc, tt, ct, _) in rows
+                ]
+            if rp.stacks:
+                entry["samples"] = sum(rp.stacks.values())
+                entry["top_stacks"] = [{"stack": s, "samples": n} for s, n in rp.stacks.most_common(5)]
+            out[route] = entry
+        return out
+
+    def collapsed(self, route: Optional[str] = None) -> str:
+        """Stack-uri în format collapsed (pentru flamegraph.pl / speedscope)."""
+        with self._lock:
+            items = [(r, rp) for r, rp in self._routes.items() if route is None or r == route]
+            lines = [f"{r};{s} {n}" for r, rp in items for s, n in rp.stacks.items()]
+        return "\n".join(sorted(lines)) + ("\n" if lines else "")
+
+    def pstats_text(self, route: str, sort: str = "cumulative", limit: int = 40) -> str:
+        with self._lock:
+            rp = self._routes.get(route)
+        if rp is None or rp.stats is None:
+            return ""
+        buf = io.StringIO()
+        rp.stats.stream = buf
+        rp.stats.sort_stats(sort).print_stats(limit)
+        return buf.getvalue()
+
+    def reset(self):
+        with self._lock:
+            self._routes.clear()
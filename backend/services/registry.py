@@ -0,0 +1,142 @@
+# services/registry.py
+"""Lazy, thread-safe registry for agents and adapters.
+
+Components are registered as factories and only constructed on first use.
+Each component has its own lock, so a slow or broken one (e.g. the Google
+Calendar adapter waiting on OAuth) never blocks the others. Failed inits are
+remembered for `retry_after` seconds, so callers get `None` immediately instead
+of re-running an expensive failing constructor on every request.
+"""
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Optional
+
+
+class _Slot:
+    def __init__(self, factory: Callable[[], Any], retry_after: float):
+        self.factory = factory
+        self.retry_after = retry_after
+        self.lock = threading.Lock()
+        self.instance: Any = None
+        self.error: Optional[str] = None
+        self.failed_at: Optional[float] = None
+        self.init_ms: Optional[float] = None
+        self.loading = False
+        self.started_at: Optional[float] = None
+        # setat când o încercare de init s-a terminat (cu succes sau nu)
+        self.done = threading.Event()
+
+
+class AgentRegistry:
+    def __init__(self):
+        self._slots: Dict[str, _Slot] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, factory: Callable[[], Any], retry_after: float = 60.0):
+        """Înregistrează un factory; nu construiește nimic acum."""
+        with self._lock:
+            self._slots[name] = _Slot(factory, retry_after)
+
+    def _slot(self, name: str) -> _Slot:
+        slot = self._slots.get(name)
+        if slot is None:
+            raise KeyError(f"Unknown component: {name}")
+        return slot
+
+    def _in_backoff(self, slot: _Slot) -> bool:
+        return slot.failed_at is not None and (time.monotonic() - slot.failed_at) < slot.retry_after
+
+    def _build(self, slot: _Slot):
+        """Apelat cu slot.lock ținut."""
+        if slot.instance is not None or self._in_backoff(slot):
+            slot.done.set()
+            return
+        slot.done.clear()
+        slot.loading = True
+        slot.started_at = time.monotonic()
+        t0 = time.perf_counter()
+        try:
+            slot.instance = slot.factory()
+            slot.error = None
+            slot.failed_at = None
+        except Exception as e:
+            slot.instance = None
+            slot.error = str(e)
+            slot.failed_at = time.monotonic()
+        finally:
+            slot.init_ms = round((time.perf_counter() - t0) * 1000, 2)
+            slot.loading = False
+            slot.done.set()
+
+    def get(self, name: str) -> Any:
+        """Instanța componentei (construită la primul apel) sau None dacă init-ul a eșuat."""
+        slot = self._slot(name)
+        if slot.instance is not None:
+            return slot.instance
+        if self._in_backoff(slot):
+            return None
+        with slot.lock:
+            self._build(slot)
+            return slot.instance
+
+    def get_within(self, name: str, timeout: float) -> Any:
+        """
+        Variantă cu timp de așteptare limitat, pentru dependențe opționale.
+
+        Dacă instanța nu e gata, pornește init-ul în fundal și așteaptă cel mult `timeout`
+        secunde, socotite de la începutul init-ului (request-urile care vin în timp ce un
+        init lent e în curs nu mai așteaptă încă `timeout`). În backoff -> None imediat.
+        """
+        slot = self._slot(name)
+        if slot.instance is not None:
+            return slot.instance
+        if self._in_backoff(slot):
+            return None
+        if not slot.loading and slot.lock.acquire(blocking=False):
+            def _run():
+                try:
+                    self._build(slot)
+                finally:
+                    slot.lock.release()
+
+            slot.done.clear()
+            slot.loading = True
+            slot.started_at = time.monotonic()
+            threading.Thread(target=_run, name=f"registry-init-{name}", daemon=True).start()
+
+        started = slot.started_at if slot.started_at is not None else time.monotonic()
+        remaining = timeout - (time.monotonic() - started)
+        if remaining > 0:
+            slot.done.wait(remaining)
+        return slot.instance
+
+    def state(self, name: str) -> str:
+        """"ready" | "loading" | "failed" | "idle" (încă neconstruit)."""
+        slot = self._slot(name)
+        if slot.instance is not None:
+            return "ready"
+        if slot.loading:
+            return "loading"
+        if slot.error is not None:
+            return "failed"
+        return "idle"
+
+    def error(self, name: str) -> Optional[str]:
+        return self._slot(name).error
+
+    def warm_up(self, names: Optional[Iterable[str]] = None) -> Dict[str, dict]:
+        """Construiește componentele (ex. în fiecare worker, după fork). Nu aruncă excepții."""
+        for name in (list(names) if names is not None else list(self._slots)):
+            self.get(name)
+        return self.status()
+
+    def status(self) -> Dict[str, dict]:
+        out = {}
+        for name, slot in list(self._slots.items()):
+            out[name] = {
+                "ready": slot.instance is not None,
+                "loading": slot.loading,
+                "error": slot.error,
+                "init_ms": slot.init_ms,
+            }
+        return out
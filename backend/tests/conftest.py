@@ -0,0 +1,5 @@
+import os
+import sys
+
+# testele importă modulele din backend/ la fel ca app.py (ex. `from agents...`)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
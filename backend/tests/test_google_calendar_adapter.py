@@ -0,0 +1,169 @@
+import re
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+pytest.importorskip("googleapiclient")
+
+from adapters import google_calendar_adapter as gca  # noqa: E402
+
+# calendarul e în New York, serverul în UTC
+CAL_TZ = timezone(timedelta(hours=-5))
+
+
+def _dt(val):
+    if "dateTime" in val:
+        return datetime.fromisoformat(val["dateTime"])
+    return datetime.fromisoformat(val["date"]).replace(tzinfo=CAL_TZ)
+
+
+class _Request:
+    def __init__(self, service, kwargs):
+        self.service, self.kwargs = service, kwargs
+
+    def execute(self):
+        self.service.calls += 1
+        # orice cerere trebuie să fie partial response
+        assert self.kwargs.get("fields") == gca.EVENT_FIELDS
+        lo = datetime.fromisoformat(self.kwargs["timeMin"])
+        hi = datetime.fromisoformat(self.kwargs["timeMax"])
+        items = [e for e in self.service.items if _dt(e["end"]) > lo and _dt(e["start"]) < hi]
+        offset = int(self.kwargs.get("pageToken") or 0)
+        size = self.kwargs.get("maxResults", 250)
+        keep = re.search(r"items\(([^)]*)\)", self.kwargs["fields"]).group(1).split(",")
+        resp = {"items": [{k: e[k] for k in keep if k in e} for e in items[offset: offset + size]]}
+        if offset + size < len(items):
+            resp["nextPageToken"] = str(offset + size)
+        return resp
+
+
+class _Batch:
+    def __init__(self, service, callback):
+        self.service, self.callback, self.requests = service, callback, []
+
+    def add(self, request, request_id=None):
+        self.requests.append((request, request_id))
+
+    def execute(self):
+        self.service.batch_sizes.append(len(self.requests))
+        for request, request_id in self.requests:
+            self.callback(request_id, request.execute(), None)
+
+
+class _Service:
+    def __init__(self, items):
+        self.items, self.calls, self.batch_sizes = items, 0, []
+
+    def events(self):
+        return self
+
+    def list(self, **kwargs):
+        return _Request(self, kwargs)
+
+    def new_batch_http_request(self, callback=None):
+        return _Batch(self, callback)
+
+
+def _adapter(items):
+    adapter = gca.GoogleCalendarAdapter.__new__(gca.GoogleCalendarAdapter)
+    adapter.service = _Service(items)
+    return adapter
+
+
+@pytest.fixture
+def utc_server(monkeypatch):
+    monkeypatch.setenv("TZ", "UTC")
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+def _timed(i, start):
+    return {"id": f"t{i}", "summary": f"T{i}", "description": "x" * 100,
+            "start": {"dateTime": start.isoformat()},
+            "end": {"dateTime": (start + timedelta(minutes=30)).isoformat()}}
+
+
+def test_all_day_event_on_window_boundary_is_kept(utc_server, monkeypatch):
+    monkeypatch.setattr(gca, "BULK_WINDOW_DAYS", 1)
+    lo = datetime(2026, 3, 1, 2, 0, tzinfo=timezone.utc)
+    # destule evenimente în prima zi ca prima pagină să aibă nextPageToken
+    items = [_timed(i, lo + timedelta(minutes=i)) for i in range(300)]
+    # all-day în NY începe la 05:00 UTC, după granița de la 02:00 UTC a ferestrei a 3-a
+    items.append({"id": "allday", "summary": "Trip", "start": {"date": "2026-03-03"},
+                  "end": {"date": "2026-03-04"}})
+    adapter = _adapter(items)
+
+    events = adapter._list_events(lo.isoformat(), (lo + timedelta(days=5)).isoformat(), cap=1000)
+
+    ids = [e["id"] for e in events]
+    assert "allday" in ids
+    assert len(ids) == len(set(ids)) == 301
+
+
+def test_light_calendar_uses_a_single_request():
+    now = datetime.now(timezone.utc)
+    adapter = _adapter([_timed(i, now + timedelta(days=i)) for i in range(20)])
+
+    events = adapter._list_events(now.isoformat(), (now + timedelta(days=42)).isoformat())
+
+    assert len(events) == 20
+    assert adapter.service.calls == 1
+
+
+def test_batched_fetch_uses_partial_response_and_keeps_start_order(monkeypatch):
+    monkeypatch.setattr(gca, "BULK_WINDOW_DAYS", 2)
+    lo = datetime(2026, 3, 1, tzinfo=timezone.utc)
+    # 4 evenimente/zi timp de 30 de zile, plus câteva lungi care traversează granițele
+    items = [_timed(i, lo + timedelta(hours=6 * i)) for i in range(120)]
+    for d in range(0, 30, 5):
+        items.append({"id": f"long{d}", "summary": "Long",
+                      "start": {"dateTime": (lo + timedelta(days=d, hours=20)).isoformat()},
+                      "end": {"dateTime": (lo + timedelta(days=d + 3)).isoformat()}})
+    items.sort(key=lambda e: _dt(e["start"]))
+    adapter = _adapter(items)
+    adapter.service.list = lambda **kw: _Request(adapter.service, dict(kw, maxResults=20))
+
+    events = adapter._list_events(lo.isoformat(), (lo + timedelta(days=30)).isoformat(), cap=1000)
+
+    assert adapter.service.batch_sizes, "expected the batched path"
+    assert [e["id"] for e in events] == [e["id"] for e in items]
+    assert all("description" not in e for e in events)
+
+
+def test_batches_are_chunked(monkeypatch):
+    monkeypatch.setattr(gca, "BULK_WINDOW_DAYS", 1)
+    monkeypatch.setattr(gca, "MAX_BATCH_SIZE", 10)
+    lo = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    items = [_timed(i, lo + timedelta(hours=3 * i)) for i in range(8 * 60)]
+    adapter = _adapter(items)
+    adapter.service.list = lambda **kw: _Request(adapter.service, dict(kw, maxResults=50))
+
+    events = adapter._list_events(lo.isoformat(), (lo + timedelta(days=60)).isoformat(), cap=10000)
+
+    assert len(events) == len(items)
+    assert max(adapter.service.batch_sizes) <= 10
+    assert len(adapter.service.batch_sizes) > 1
+
+
+def test_calendar_context_is_day_aligned_via_get_events_between(utc_server):
+    app = pytest.importorskip("app")
+    today = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    items = [
+        _timed(0, today - timedelta(hours=2)),                 # ieri
+        _timed(1, today + timedelta(minutes=1)),               # azi devreme (de regulă deja încheiat)
+        _timed(2, today + timedelta(days=1, hours=9)),
+        _timed(3, today + timedelta(days=7, minutes=1)),       # după fereastră
+    ]
+    adapter = _adapter(items)
+    calls = []
+    original = adapter.get_events_between
+    adapter.get_events_between = lambda lo, hi, cap=400: calls.append((lo, hi)) or original(lo, hi, cap)
+
+    ctx = app.build_calendar_context_for_next_days(adapter, days=7)
+
+    assert calls == [(today.isoformat(), (today + timedelta(days=7)).isoformat())]
+    assert "00:01-00:31 T1" in ctx and "T2" in ctx
+    assert "T0" not in ctx and "T3" not in ctx
@@ -0,0 +1,76 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from agents.model_router import ModelRouter, Route
+
+
+def _router(hedge_after=0.2, budget=1.5, fast_model="fast-model"):
+    return ModelRouter(
+        {"primary": "slow-model", "fast": fast_model},
+        {
+            "plan": Route("plan", ["primary", "fast"], budget=budget, hedge_after=hedge_after),
+            "edit": Route("edit", ["fast"], budget=budget),
+        },
+        agent_routes={"Calendar": "plan"},
+        edit_max_chars=100,
+    )
+
+
+def _degraded(model, timeout):
+    # tier-ul primar e degradat, cel rapid e sănătos
+    time.sleep(3 if model == "slow-model" else 0.05)
+    return model
+
+
+def test_hedges_are_not_starved_by_slow_calls():
+    router = _router()
+    with ThreadPoolExecutor(max_workers=20) as pool:
+        results = list(pool.map(lambda _: router.call("p", _degraded, task="plan"), range(20)))
+
+    assert all(tier == "fast" for _, tier, _ in results)
+    assert router.stats()["plan"] == {"hedged": 20, "answered:fast": 20}
+
+
+def test_failed_primary_falls_back_without_waiting_for_hedge():
+    router = _router(hedge_after=10)
+
+    def complete(model, timeout):
+        if model == "slow-model":
+            raise ValueError("down")
+        return model
+
+    t0 = time.monotonic()
+    assert router.call("p", complete, task="plan") == ("fast-model", "fast", "fast-model")
+    assert time.monotonic() - t0 < 1
+
+
+def test_budget_exceeded_raises_timeout():
+    router = _router(budget=0.3)
+    with pytest.raises(TimeoutError):
+        router.call("p", lambda model, timeout: time.sleep(2), task="edit")
+    assert router.stats()["edit"] == {"timeout": 1}
+
+
+def test_select_by_task_then_agent_then_prompt_size():
+    router = _router()
+    assert router.select("short").name == "edit"
+    assert router.select("x" * 1000).name == "plan"
+    assert router.select("x" * 1000, task="edit").name == "edit"
+    assert router.select("short", agent="Calendar").name == "plan"
+    assert router.select("short", task="unknown", agent="Food").name == "edit"
+
+
+def test_no_hedge_when_next_tier_is_the_same_model():
+    router = _router(hedge_after=0.05, fast_model="slow-model")
+    calls = []
+
+    def complete(model, timeout):
+        calls.append(model)
+        time.sleep(0.3)
+        return model
+
+    assert router.call("x" * 1000, complete, task="plan")[1] == "primary"
+    assert calls == ["slow-model"]
+    assert "hedged" not in router.stats()["plan"]
@@ -0,0 +1,123 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from services import precompute as pc
+from services.precompute import PlanCache, PrecomputeScheduler
+
+
+class _Agent:
+    def __init__(self):
+        self.prompts = []
+        self.tasks = []
+
+    def ask(self, prompt, task=None):
+        self.prompts.append(prompt)
+        self.tasks.append(task)
+        return "plan for " + prompt
+
+
+def _scheduler(agent, budget=100000, cache=None):
+    return PrecomputeScheduler(
+        cache or PlanCache(),
+        kinds={"food": (lambda p, cal: f"diet={p['diet_pref']} | {cal}", lambda: agent)},
+        calendar_context=lambda start_day: f"week from {start_day.isoformat()}",
+        daily_token_budget=budget,
+        idle_grace=0,
+    )
+
+
+def _prompt(diet, start_day):
+    return f"diet={diet} | week from {start_day.isoformat()}"
+
+
+def test_generates_today_and_tomorrow_windows_without_hedging():
+    agent = _Agent()
+    sched = _scheduler(agent)
+    sched.remember("food", {"diet_pref": "vegan"})
+
+    assert sched.run_once() == 2
+
+    today = date.today()
+    assert agent.prompts == [_prompt("vegan", today), _prompt("vegan", today + timedelta(days=1))]
+    assert agent.tasks == ["background", "background"]
+    assert sched.cache.take(_prompt("vegan", today + timedelta(days=1))) is not None
+
+
+def test_done_keys_are_skipped_on_the_next_pass():
+    agent = _Agent()
+    sched = _scheduler(agent)
+    sched.remember("food", {"diet_pref": "vegan"})
+    sched.run_once()
+
+    assert sched.run_once() == 0
+    assert len(agent.prompts) == 2
+
+
+def test_served_prompt_is_not_regenerated():
+    agent = _Agent()
+    sched = _scheduler(agent)
+    sched.remember("food", {"diet_pref": "keto"}, served_prompt=_prompt("keto", date.today()))
+
+    assert sched.run_once() == 1
+    assert agent.prompts == [_prompt("keto", date.today() + timedelta(days=1))]
+
+
+def test_budget_cutoff_stops_generation():
+    agent = _Agent()
+    prompt_tokens = pc.estimate_tokens(_prompt("vegan", date.today()))
+    # ajunge pentru primul plan (prompt + răspuns), nu și pentru al doilea
+    sched = _scheduler(agent, budget=3 * prompt_tokens)
+    sched.remember("food", {"diet_pref": "vegan"})
+
+    assert sched.run_once() == 1
+    assert sched.stats["skipped_budget"] == 1
+    assert sched.status()["tokens_used_today"] <= 3 * prompt_tokens
+
+
+def test_take_serves_once_and_expires_after_ttl(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(pc.time, "time", lambda: clock[0])
+    cache = PlanCache(ttl=60)
+
+    cache.put("p", "plan")
+    assert cache.take("p") == "plan"
+    assert cache.take("p") is None
+
+    cache.put("p", "plan")
+    clock[0] += 61
+    assert cache.take("p") is None
+
+
+class _DayAdapter:
+    """Calendarul întoarce evenimentele care încep în [timeMin, timeMax)."""
+
+    def __init__(self, events):
+        self.events = events
+
+    def get_events_between(self, time_min_iso, time_max_iso, cap=400):
+        lo, hi = datetime.fromisoformat(time_min_iso), datetime.fromisoformat(time_max_iso)
+        return [e for e in self.events if lo <= datetime.fromisoformat(e["start"]) < hi][:cap]
+
+
+def test_calendar_context_is_stable_while_now_moves_within_the_day(monkeypatch):
+    app = pytest.importorskip("app")
+    tz = datetime.now().astimezone().tzinfo
+    day = datetime(2026, 5, 4, tzinfo=tz)
+    events = [{"summary": f"E{h}", "location": "",
+               "start": (day + timedelta(hours=h)).isoformat(),
+               "end": (day + timedelta(hours=h, minutes=30)).isoformat()} for h in (1, 9, 15, 33)]
+    adapter = _DayAdapter(events)
+
+    contexts = []
+    for hour in (0, 10, 16, 23):
+        class _Now(datetime):
+            @classmethod
+            def now(cls, tz=None, _h=hour):
+                return (day + timedelta(hours=_h)).astimezone(tz) if tz else day + timedelta(hours=_h)
+
+        monkeypatch.setattr(app, "datetime", _Now)
+        contexts.append(app.build_calendar_context_for_next_days(adapter, days=7))
+
+    assert len(set(contexts)) == 1
+    assert "E1" in contexts[0] and "E33" in contexts[0]
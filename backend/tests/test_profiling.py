@@ -0,0 +1,108 @@
+import threading
+import time
+
+import pytest
+
+from services.profiling import RouteProfiler
+
+
+def _busy(seconds):
+    end = time.perf_counter() + seconds
+    n = 0
+    while time.perf_counter() < end:
+        n += 1
+    return n
+
+
+def test_unknown_mode_is_rejected():
+    with pytest.raises(ValueError):
+        RouteProfiler(mode="perf")
+
+
+def test_should_profile_header_wins_over_sample_rate():
+    never = RouteProfiler(sample_rate=0.0)
+    assert never.should_profile("1") is True
+    assert never.should_profile(" On ") is True
+    assert never.should_profile(None) is False
+
+    always = RouteProfiler(sample_rate=1.0)
+    assert always.should_profile(None) is True
+    assert always.should_profile("0") is False
+
+
+def test_cprofile_aggregates_requests_per_route():
+    profiler = RouteProfiler(mode="cprofile")
+    for _ in range(2):
+        token = profiler.start("/api/food")
+        assert token is not None
+        _busy(0.01)
+        profiler.stop(token)
+
+    entry = profiler.summary()["/api/food"]
+    assert entry["requests"] == 2
+    assert entry["max_ms"] >= 10
+    assert any("_busy" in row["function"] for row in entry["top_cumulative"])
+    assert "_busy" in profiler.pstats_text("/api/food")
+    assert profiler.pstats_text("/api/other") == ""
+
+
+def test_cprofile_skips_a_concurrent_request():
+    profiler = RouteProfiler(mode="cprofile")
+    first = profiler.start("/api/food")
+    try:
+        assert profiler.start("/api/fitness") is None
+    finally:
+        profiler.stop(first)
+    assert list(profiler.summary()) == ["/api/food"]
+
+
+def test_sample_mode_collects_collapsed_stacks():
+    profiler = RouteProfiler(mode="sample", interval=0.001)
+    token = profiler.start("/api/food")
+    _busy(0.1)
+    profiler.stop(token)
+
+    entry = profiler.summary()["/api/food"]
+    assert entry["requests"] == 1
+    assert entry["samples"] > 0
+    lines = profiler.collapsed("/api/food").splitlines()
+    assert lines and all(line.startswith("/api/food;") for line in lines)
+    assert any("_busy (test_profiling.py" in line for line in lines)
+    assert profiler.collapsed("/api/other") == ""
+
+
+def test_sampler_is_idle_without_active_requests():
+    profiler = RouteProfiler(mode="sample", interval=0.001)
+    other_started, release = threading.Event(), threading.Event()
+
+    def other_request():
+        token = profiler.start("/api/fitness")
+        other_started.set()
+        release.wait()
+        profiler.stop(token)
+
+    t = threading.Thread(target=other_request)
+    t.start()
+    other_started.wait()
+    token = profiler.start("/api/food")
+    profiler.stop(token)
+    # încă un request profilat în alt thread -> samplerul rămâne activ
+    assert profiler._has_active.is_set()
+    release.set()
+    t.join()
+    assert not profiler._has_active.is_set()
+
+    time.sleep(0.01)  # lasă samplerul să termine o trecere începută înainte de stop
+    samples = sum(e.get("samples", 0) for e in profiler.summary().values())
+    time.sleep(0.05)
+    assert sum(e.get("samples", 0) for e in profiler.summary().values()) == samples
+    assert profiler._sampler.is_alive()
+
+
+def test_reset_clears_all_routes():
+    profiler = RouteProfiler(mode="cprofile")
+    profiler.stop(profiler.start("/api/food"))
+    assert profiler.summary()
+    profiler.reset()
+    assert profiler.summary() == {}
+    assert profiler.collapsed() == ""
@@ -0,0 +1,111 @@
+import threading
+import time
+
+from services.registry import AgentRegistry
+
+
+def _counting(delay=0.0, fail=False):
+    calls = []
+
+    def factory():
+        calls.append(threading.get_ident())
+        time.sleep(delay)
+        if fail:
+            raise RuntimeError("no credentials")
+        return object()
+
+    return factory, calls
+
+
+def _run_concurrently(fns):
+    results = [None] * len(fns)
+    barrier = threading.Barrier(len(fns))
+
+    def worker(i):
+        barrier.wait()
+        results[i] = fns[i]()
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(len(fns))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results
+
+
+def test_concurrent_first_use_constructs_exactly_once():
+    registry = AgentRegistry()
+    factory, calls = _counting(delay=0.1)
+    registry.register("agent", factory)
+
+    results = _run_concurrently([lambda: registry.get("agent")] * 16)
+
+    assert len(calls) == 1
+    assert all(r is results[0] and r is not None for r in results)
+
+
+def test_blocking_get_racing_get_within_constructs_once():
+    registry = AgentRegistry()
+    factory, calls = _counting(delay=0.2)
+    registry.register("adapter", factory)
+
+    results = _run_concurrently(
+        [lambda: registry.get("adapter")] * 4 + [lambda: registry.get_within("adapter", 2.0)] * 4)
+
+    assert len(calls) == 1
+    assert all(r is results[0] and r is not None for r in results)
+
+
+def test_get_within_wait_is_counted_from_init_start():
+    registry = AgentRegistry()
+    factory, calls = _counting(delay=1.0)
+    registry.register("adapter", factory)
+
+    t0 = time.monotonic()
+    assert registry.get_within("adapter", 0.2) is None
+    first = time.monotonic() - t0
+    assert 0.15 <= first < 0.6
+    assert registry.state("adapter") == "loading"
+
+    # a doua cerere, în timpul aceluiași init lent, nu mai așteaptă încă 0.2s
+    t0 = time.monotonic()
+    assert registry.get_within("adapter", 0.2) is None
+    assert time.monotonic() - t0 < 0.05
+    assert len(calls) == 1
+
+    # init-ul se termină în fundal; instanța devine disponibilă
+    assert registry._slot("adapter").done.wait(2)
+    assert registry.get_within("adapter", 0.2) is not None
+
+
+def test_get_within_returns_immediately_during_backoff():
+    registry = AgentRegistry()
+    factory, calls = _counting(delay=0.05, fail=True)
+    registry.register("adapter", factory, retry_after=60)
+
+    assert registry.get_within("adapter", 1.0) is None
+    assert registry.state("adapter") == "failed"
+
+    t0 = time.monotonic()
+    assert registry.get_within("adapter", 1.0) is None
+    assert registry.get("adapter") is None
+    assert time.monotonic() - t0 < 0.05
+    assert len(calls) == 1
+    assert registry.error("adapter") == "no credentials"
+
+
+def test_retry_after_backoff_window():
+    registry = AgentRegistry()
+    attempts = []
+
+    def factory():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise RuntimeError("flaky")
+        return "ok"
+
+    registry.register("adapter", factory, retry_after=0.1)
+    assert registry.get("adapter") is None
+    time.sleep(0.15)
+    assert registry.get_within("adapter", 1.0) == "ok"
+    assert len(attempts) == 2
@@ -0,0 +1,244 @@
+# tools/loadgen.py
+"""Load generator for the Flask routes, against stubbed upstreams.
+
+OpenAI is replaced by an in-process stub (canned completions). Google Calendar
+uses the real `googleapiclient` service (static discovery document) over a fake
+HTTP transport serving synthetic events, so request building shows up in the
+profiles next to our own code: JSON encoding, ISO parsing, prompt building,
+routing. Profiling is switched on for every request and the aggregated profile
+is written out at the end.
+
+    python tools/loadgen.py --requests 500 --concurrency 8 --out profile.collapsed
+    flamegraph.pl profile.collapsed > profile.svg     # sau deschide fișierul în speedscope
+
+With --mode cprofile, a pstats report per route is printed instead.
+"""
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from email.parser import BytesParser
+from urllib.parse import parse_qs, urlparse
+
+try:
+    import httplib2
+    from googleapiclient.discovery import build
+    from googleapiclient.http import HttpMock
+except ImportError:
+    # fără librăriile google rutele de calendar rulează fără adapter
+    build = None
+    HttpMock = object
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+
+# ---------------- Stub-uri upstream ----------------
+def _synthetic_events(n: int, days: int = 60):
+    """Evenimente brute în formatul Google Calendar API (dateTime + câteva all-day)."""
+    now = datetime.now().astimezone()
+    start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    rnd = random.Random(42)
+    items = []
+    for i in range(n):
+        s = start + timedelta(minutes=rnd.randrange(0, days * 24 * 60, 15))
+        if i % 10 == 0:
+            ev = {"start": {"date": s.date().isoformat()},
+                  "end": {"date": (s.date() + timedelta(days=1)).isoformat()}}
+        else:
+            ev = {"start": {"dateTime": s.isoformat()},
+                  "end": {"dateTime": (s + timedelta(minutes=rnd.choice([30, 60, 90]))).isoformat()}}
+        ev.update({"id": f"ev{i}", "summary": f"Event {i}", "location": "Room %d" % (i % 7),
+                   "description": "x" * 200, "htmlLink": f"https://calendar.example/ev{i}"})
+        items.append(ev)
+    items.sort(key=lambda e: _ev_dt(e, "start"))
+    return items
+
+
+def _ev_dt(e, key):
+    val = e[key]
+    if "dateTime" in val:
+        return datetime.fromisoformat(val["dateTime"])
+    return datetime.fromisoformat(val["date"]).replace(tzinfo=datetime.now().astimezone().tzinfo)
+
+
+def _list_response(items, params):
+    """Răspunsul lui `events.list` ca API-ul real: suprapunere pe interval, paging, `fields`."""
+    lo, hi = params.get("timeMin"), params.get("timeMax")
+    lo = datetime.fromisoformat(lo.replace("Z", "+00:00")) if lo else None
+    hi = datetime.fromisoformat(hi.replace("Z", "+00:00")) if hi else None
+    items = [e for e in items
+             if (lo is None or _ev_dt(e, "end") > lo) and (hi is None or _ev_dt(e, "start") < hi)]
+    offset = int(params.get("pageToken") or 0)
+    page_size = int(params.get("maxResults") or 250)
+    page = items[offset: offset + page_size]
+    m = re.search(r"items\(([^)]*)\)", params.get("fields") or "")
+    if m:
+        keep = m.group(1).split(",")
+        page = [{k: e[k] for k in keep if k in e} for e in page]
+    resp = {"items": page}
+    if offset + page_size < len(items):
+        resp["nextPageToken"] = str(offset + page_size)
+    return resp
+
+
+class _CalendarHttpMock(HttpMock):
+    """
+    Transport HTTP fals pentru un service construit cu `discovery.build`: construcția
+    URI-urilor și a parametrilor rulează prin googleapiclient, doar rețeaua e simulată.
+    Răspunde dinamic (după query), inclusiv la cererile batch (multipart/mixed).
+    """
+
+    def __init__(self, items, delay):
+        super().__init__(headers={"status": "200"})
+        self._items, self._delay = items, delay
+
+    def _answer(self, uri):
+        params = {k: v[0] for k, v in parse_qs(urlparse(uri).query).items()}
+        return json.dumps(_list_response(self._items, params))
+
+    def request(self, uri, method="GET", body=None, headers=None, redirections=1, connection_type=None):
+        if self._delay:
+            time.sleep(self._delay)
+        if "/batch/" not in uri:
+            return httplib2.Response({"status": "200", "content-type": "application/json"}), \
+                self._answer(uri).encode("utf-8")
+
+        # un singur round-trip pentru tot batch-ul
+        parsed = BytesParser().parsebytes(
+            f"content-type: {headers['content-type']}\r\n\r\n".encode("utf-8") + body.encode("utf-8"))
+        boundary = "batch_loadgen"
+        out = []
+        for part in parsed.get_payload():
+            request_line = part.get_payload().split("\n", 1)[0]
+            path = request_line.split(" ")[1]
+            out.append(
+                f"--{boundary}\r\nContent-Type: application/http\r\n"
+                f"Content-ID: <response-{part['Content-ID'][1:-1]}>\r\n\r\n"
+                f"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n\r\n{self._answer(path)}\r\n")
+        out.append(f"--{boundary}--")
+        return httplib2.Response({"status": "200", "content-type": f"multipart/mixed; boundary={boundary}"}), \
+            "".join(out).encode("utf-8")
+
+
+def _make_stub_adapter(n_events: int, delay: float):
+    """
+    Adapterul real (fără OAuth) peste service-ul real `calendar v3`, construit din documentul
+    de discovery static, cu transportul HTTP simulat.
+    """
+    from adapters.google_calendar_adapter import GoogleCalendarAdapter
+    adapter = GoogleCalendarAdapter.__new__(GoogleCalendarAdapter)
+    adapter.creds = None
+    adapter.service = build("calendar", "v3", http=_CalendarHttpMock(_synthetic_events(n_events), delay),
+                            static_discovery=True, cache_discovery=False)
+    return adapter
+
+
+class _StubOpenAI:
+    """Imită `openai.ChatCompletion.create` (API-ul folosit de BaseAgent)."""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.api_key = None
+        self.ChatCompletion = self
+
+    def create(self, model, messages, **kwargs):
+        if self.delay:
+            time.sleep(self.delay)
+        text = f"[{model}] " + ("Day plan line.\n" * 40)
+        msg = {"content": text}
+        return type("Resp", (), {"choices": [type("Choice", (), {"message": msg})()]})()
+
+
+# ---------------- Load ----------------
+def _percentile(values, p):
+    if not values:
+        return None
+    values = sorted(values)
+    return round(values[min(len(values) - 1, int(len(values) * p))], 2)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--requests", type=int, default=300)
+    ap.add_argument("--concurrency", type=int, default=4)
+    ap.add_argument("--mode", choices=["sample", "cprofile"], default="sample")
+    ap.add_argument("--events", type=int, default=400, help="evenimente sintetice în calendar")
+    ap.add_argument("--upstream-ms", type=float, default=0.0, help="latență simulată pentru upstream-uri")
+    ap.add_argument("--out", default="profile.collapsed", help="fișier pentru stack-uri (modul sample)")
+    args = ap.parse_args()
+
+    os.environ["PROFILING_ENABLED"] = "1"
+    os.environ["PROFILING_MODE"] = args.mode
+    os.environ["PROFILING_SAMPLE_RATE"] = "1"
+    os.environ["PRECOMPUTE_ENABLED"] = "0"
+    os.environ.setdefault("ADMIN_TOKEN", "loadgen-%d" % random.randrange(10 ** 9))
+    admin = {"X-Admin-Token": os.environ["ADMIN_TOKEN"]}
+
+    import app as app_module
+    import agents.base_agent as base_agent
+
+    delay = args.upstream_ms / 1000.0
+    base_agent.openai = _StubOpenAI(delay)
+    if build is not None:
+        adapter_factory = lambda: _make_stub_adapter(args.events, delay)
+    else:
+        print("google libs missing: calendar routes will run without an adapter", file=sys.stderr)
+        adapter_factory = lambda: None
+    app_module.registry.register("google_adapter", adapter_factory)
+    app_module.registry.warm_up()
+
+    scenarios = [
+        ("GET", "/events?max_results=20", None),
+        ("GET", "/api/calendar/month-split?limit_past=50&limit_future=50", None),
+        ("GET", "/api/calendar/now-and-next?limit=20", None),
+        ("POST", "/api/food/generate", {"diet_pref": "vegetarian"}),
+        ("POST", "/api/food/generate", {"diet_pref": "keto", "prompt": "swap dinner on Friday"}),
+        ("POST", "/api/fitness/generate", {"goal": "fat loss", "experience": "beginner"}),
+        ("POST", "/plan", {"goal": "muscle gain", "diet_pref": "high protein"}),
+    ]
+    latencies = {}
+    lock = threading.Lock()
+    local = threading.local()
+
+    def one(i):
+        client = getattr(local, "client", None)
+        if client is None:
+            client = local.client = app_module.app.test_client()
+        method, url, body = scenarios[i % len(scenarios)]
+        t0 = time.perf_counter()
+        resp = client.open(url, method=method, json=body)
+        ms = (time.perf_counter() - t0) * 1000
+        with lock:
+            latencies.setdefault(f"{method} {url.split('?')[0]} [{resp.status_code}]", []).append(ms)
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        list(pool.map(one, range(args.requests)))
+    wall = time.perf_counter() - t0
+
+    print(f"{args.requests} requests in {wall:.2f}s ({args.requests / wall:.1f} req/s)")
+    for key, vals in sorted(latencies.items()):
+        print(f"  {key:<50} n={len(vals):<5} p50={_percentile(vals, 0.5)}ms p99={_percentile(vals, 0.99)}ms")
+
+    client = app_module.app.test_client()
+    if args.mode == "sample":
+        collapsed = client.get("/api/admin/profiles?format=collapsed", headers=admin).get_data(as_text=True)
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(collapsed)
+        print(f"collapsed stacks -> {args.out}")
+    else:
+        summary = client.get("/api/admin/profiles", headers=admin).get_json()
+        for endpoint in summary.get("routes", {}):
+            print(f"\n===== {endpoint} =====")
+            print(client.get(f"/api/admin/profiles/{endpoint}?format=pstats", headers=admin).get_data(as_text=True))
+    print(json.dumps(client.get("/api/admin/profiles?top=5", headers=admin).get_json(), indent=2)[:4000])
+
+
+if __name__ == "__main__":
+    main()